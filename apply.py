@@ -1,37 +1,123 @@
 # Import necessary libraries
 import streamlit as st  
 import pandas as pd  
+import numpy as np
 import plotly.express as px  
 import plotly.graph_objs as go  
+import os
+import tempfile
+from pathlib import Path
+
+# Columns shown in the data table and used by the maps
+DISPLAY_COLS = ['name', 'address', 'categories', 'city', 'postalCode', 'province']
+MAP_COLS = ['latitude', 'longitude', 'name', 'address', 'city', 'province']
+
+# On-disk copy of the cleaned data so cold starts skip the CSV download and parse;
+# bump the version whenever the columns or cleaning in load_and_clean_data change
+PARQUET_CACHE_VERSION = 1
+PARQUET_CACHE_PATH = Path(tempfile.gettempdir()) / f'fastfood-v{PARQUET_CACHE_VERSION}.parquet'
+
+# Maximum number of markers drawn on the density map
+MAX_MAP_POINTS = 2000
 
 # Function to load and clean the data
 @st.cache_data
 def load_and_clean_data():
+    # Reuse the cleaned data from a previous cold start if available;
+    # an unreadable cache file is discarded and rebuilt from the CSV
+    if PARQUET_CACHE_PATH.exists():
+        try:
+            return pd.read_parquet(PARQUET_CACHE_PATH)
+        except Exception:
+            PARQUET_CACHE_PATH.unlink(missing_ok=True)
+
+    # Loading data from GitHub repository (same as code one)
+    url = "https://raw.githubusercontent.com/nyamux/fastfood/main/fastfoodus.csv"
+    df = pd.read_csv(url, usecols=['id'] + list(dict.fromkeys(DISPLAY_COLS + MAP_COLS)))
+    
+    # Drop duplicate rows based on 'id' column
+    df = df.drop_duplicates(subset=['id'], keep='last').drop(columns='id')
+    
+    # Clean the 'categories' column
+    df['categories'] = df['categories'].str.strip().str.lower()
+
+    # Clean the 'city' column
+    df['city'] = df['city'].str.strip().str.lower()
+
+    # Store repeated string columns as categoricals for faster filtering and grouping
+    for column in ('province', 'city', 'categories', 'name'):
+        df[column] = df[column].astype('category')
+
+    # Save the cleaned data for the next cold start via a temporary file, so an interrupted
+    # write never leaves a partial cache; the app still works if any step of this fails
+    tmp_path = None
     try:
-        # Loading data from GitHub repository (same as code one)
-        url = "https://raw.githubusercontent.com/nyamux/fastfood/main/fastfoodus.csv"
-        df = pd.read_csv(url)
-        
-        # Drop duplicate rows based on 'id' column
-        df = df.drop_duplicates(subset=['id'], keep='last')
-        
-        # Clean the 'categories' column
-        df['categories'] = df['categories'].str.strip().str.lower()
-        
-        return df
+        fd, tmp_path = tempfile.mkstemp(dir=PARQUET_CACHE_PATH.parent, suffix='.parquet.tmp')
+        os.close(fd)
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, PARQUET_CACHE_PATH)
+    except Exception:
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
     
-    except pd.errors.EmptyDataError:
-        st.error("Error: No data found in the file.")
-    except KeyError:
-        st.error("Error: The 'categories' column is missing in the data.")
-    except Exception as e:
-        st.error(f"An unexpected error occurred: {e}")
+    return df
+
+# Plotly groups on every category of a categorical column, including ones with no rows
+def drop_unused_categories(df):
+    """Remove unobserved categories from the categorical columns before plotting."""
+    categorical_columns = df.select_dtypes('category').columns
+    return df.assign(**{column: df[column].cat.remove_unused_categories() for column in categorical_columns})
+
+# Cached lookups for the sidebar options; _df is the loader's single cached frame,
+# so the leading underscore tells Streamlit to skip hashing it on every call
+@st.cache_data
+def get_provinces(_df):
+    """Get the sorted list of provinces."""
+    return sorted(_df['province'].unique().tolist())
+
+@st.cache_data
+def get_cities_by_province(_df):
+    """Map each province (and "All") to its sorted list of cities."""
+    cities_by_province = _df.groupby('province', observed=True)['city'].unique().apply(sorted).to_dict()
+    cities_by_province["All"] = sorted(_df['city'].unique().tolist())
+    return cities_by_province
+
+@st.cache_data
+def get_categories(_df):
+    """Get the sorted list of categories."""
+    return sorted(_df['categories'].dropna().unique().tolist())
+
+# Cached counts over the full dataset; _df is unhashed like the sidebar lookups above
+@st.cache_data
+def province_counts(_df):
+    """Count locations per province."""
+    return _df['province'].value_counts()
+
+@st.cache_data
+def province_category_counts(_df):
+    """Count locations per province and category."""
+    return _df.groupby(['province', 'categories'], observed=True).size().reset_index(name='count')
 
 # Set up the page for the Streamlit app
 st.set_page_config(page_title="Fast Food Location Dashboard", layout="wide")
 
-# Load data
-df = load_and_clean_data()
+# Load data; errors are handled outside the cached loader so st.cache_data
+# never memoizes a failed load and the next rerun retries it
+try:
+    df = load_and_clean_data()
+except pd.errors.EmptyDataError:
+    st.error("Error: No data found in the file.")
+    df = None
+except pd.errors.ParserError as e:
+    st.error(f"Error: The data file could not be parsed: {e}")
+    df = None
+except ValueError as e:
+    # read_csv raises ValueError when a column in usecols is missing
+    st.error(f"Error: Required columns are missing in the data: {e}")
+    df = None
+except OSError as e:
+    st.error(f"Error: The data could not be downloaded: {e}")
+    df = None
 
 if df is not None:
     st.sidebar.title("Filters")
@@ -40,7 +126,7 @@ if df is not None:
     st.title("Fast Food Locations Data Visualization")
 
     # Dropdown menu for selecting a province
-    selected_province = st.sidebar.selectbox("Select State", options=["All"] + sorted(df['province'].unique().tolist()))
+    selected_province = st.sidebar.selectbox("Select State", options=["All"] + get_provinces(df))
 
     # Function to filter data by the selected province
     def filter_data_by_province(province="All"):
@@ -49,14 +135,8 @@ if df is not None:
             return df
         return df[df['province'] == province]
 
-    # Apply the province filter
-    filtered_df = filter_data_by_province(selected_province)
-
-    # Filter available cities based on the selected province
-    if selected_province == "All":
-        available_cities = sorted(df['city'].unique().tolist())
-    else:
-        available_cities = sorted(df[df['province'] == selected_province]['city'].unique().tolist())
+    # Look up available cities for the selected province
+    available_cities = get_cities_by_province(df)[selected_province]
 
     # Dropdown menu for selecting a city
     selected_city = st.sidebar.selectbox("Select City", options=["All"] + available_cities)
@@ -64,16 +144,18 @@ if df is not None:
     # Function to filter data by city and province
     def filter_data_by_city_province(df, city, province):
         """Filter the DataFrame by selected city and province."""
-        if province == "All":
-            if city == "All":
-                return df
-            return df[df['city'].str.lower() == city.lower()]
-        if city == "All":
-            return df[df['province'] == province]
-        return df[(df['city'].str.lower() == city.lower()) & (df['province'] == province)]
+        if city == "All" and province == "All":
+            return df
+        # Compare integer category codes rather than the category values
+        mask = np.ones(len(df), dtype=bool)
+        if province != "All":
+            mask &= df['province'].cat.codes.values == df['province'].cat.categories.get_loc(province)
+        if city != "All":
+            mask &= df['city'].cat.codes.values == df['city'].cat.categories.get_loc(city)
+        return df[mask]
 
-    # Apply the city and province filter
-    filtered_city_province_df = filter_data_by_city_province(filtered_df, selected_city, selected_province)
+    # Apply the city and province filter in a single pass over the full data
+    filtered_city_province_df = filter_data_by_city_province(df, selected_city, selected_province)
 
     # Display filtered data
     st.title("Fast Food Restaurant Data")
@@ -81,38 +163,48 @@ if df is not None:
     if not filtered_city_province_df.empty:
         location_text = f"{selected_city}, {selected_province}" if selected_province != "All" else "All Locations"
         st.subheader(f"Details for Fast Food Restaurants in {location_text}")
-        st.write(filtered_city_province_df[['name', 'address', 'categories','city', 'postalCode', 'province']])
+        st.write(filtered_city_province_df[DISPLAY_COLS])
     else:
         st.write(f"No fast food restaurants found in the selected location.")
 
-    # Count locations per province
-    province_counts = filtered_city_province_df['province'].value_counts().reset_index()
-    province_counts.columns = ['province', 'count']
+    # Count locations per province, recounting only when a city narrows the rows
+    if selected_city == "All":
+        location_counts = pd.Series(
+            province_counts(df).reindex(filtered_city_province_df['province']).to_numpy(),
+            index=filtered_city_province_df.index
+        )
+    else:
+        location_counts = filtered_city_province_df.groupby('province', observed=True)['province'].transform('size')
+
+    # Sample map data if too large; counts above still reflect every location
+    map_data = filtered_city_province_df
+    if len(map_data) > MAX_MAP_POINTS:
+        map_data = map_data.sample(n=MAX_MAP_POINTS, random_state=42)
 
-    # Join counts back to filtered DataFrame
-    map_data = pd.merge(filtered_city_province_df, province_counts, on='province', how='left')
+    # Attach the counts to the (possibly sampled) rows so only those rows are copied
+    map_data = drop_unused_categories(map_data.assign(count=location_counts))
 
     # Plotting the map
     if not map_data.empty:
-        fig_map = px.scatter_mapbox(
+        fig_map = px.density_mapbox(
             map_data,
             lat="latitude",
             lon="longitude",
-            color="count",
-            size="count",
+            z="count",
+            radius=10,
             hover_name="name",
             hover_data={"address": True, "city": True, "province": True, "count": True},
-            zoom=10,
+            zoom=4,
             height=600,
+            mapbox_style="open-street-map",
             title=f"Density Map of Fast-Food Locations in {location_text}"
         )
-        fig_map.update_layout(mapbox_style="open-street-map")
         st.plotly_chart(fig_map)
 
     # Category analysis
     categories_selected = st.sidebar.multiselect(
         "Select Categories",
-        options=sorted(df['categories'].unique().tolist())
+        options=get_categories(df)
     )
 
     # Function to filter data by categories
@@ -122,9 +214,14 @@ if df is not None:
             return df
         return df[df['categories'].isin(categories_selected)]
 
-    # Apply category filter
-    category_data = get_category_data(categories_selected)
-    category_counts = category_data.groupby(['province', 'categories']).size().reset_index(name='count')
+    # Apply category filter, reusing the cached counts when no categories are selected
+    if not categories_selected:
+        category_counts = province_category_counts(df)
+    else:
+        category_data = get_category_data(categories_selected)
+        category_counts = category_data.groupby(['province', 'categories'], observed=True).size().reset_index(name='count')
+
+    category_counts = drop_unused_categories(category_counts)
 
     # Plot category frequency
     fig_bar = px.bar(
@@ -139,10 +236,10 @@ if df is not None:
     st.plotly_chart(fig_bar)
 
     # Pie chart for category distribution
-    type_counts = category_data['categories'].value_counts()
+    type_counts = category_counts.groupby('categories', observed=True)['count'].sum().sort_values(ascending=False)
     fig_pie = px.pie(
         values=type_counts.values,
-        names=type_counts.index,
+        names=type_counts.index.remove_unused_categories(),
         title="Distribution of Fast-Food Types"
     )
     st.plotly_chart(fig_pie)
@@ -150,8 +247,9 @@ if df is not None:
     # Top 10 restaurants analysis
     def get_top_10_restaurants(df):
         """Get the top 10 most common restaurant names."""
-        restaurant_counts = df.groupby(['name']).size().reset_index(name='count')
-        return restaurant_counts.sort_values(by=['count'], ascending=False).head(10)
+        restaurant_counts = df['name'].value_counts().head(10)
+        restaurant_counts = restaurant_counts[restaurant_counts > 0]
+        return restaurant_counts.rename_axis('name').reset_index(name='count')
 
     # Get and display top 10 restaurants
     if selected_province == "All":
@@ -161,11 +259,17 @@ if df is not None:
         
     st.title(f"Top 10 Most Common Restaurants in {location_text}")
     
+    # Reuse the filtered data unless a city narrowed it below the province
+    if selected_city == "All":
+        filtered_df = filtered_city_province_df
+    else:
+        filtered_df = filter_data_by_province(selected_province)
     top_10_restaurants_data = get_top_10_restaurants(filtered_df)
     st.write(top_10_restaurants_data)
 
     # Map of top 10 restaurants
-    top_10_data = df[df['name'].isin(top_10_restaurants_data['name'])]
+    top_10_codes = df['name'].cat.categories.get_indexer(top_10_restaurants_data['name'].values)
+    top_10_data = drop_unused_categories(filtered_df[filtered_df['name'].cat.codes.isin(top_10_codes)])
     
     if not top_10_data.empty:
         fig_top_10_map = px.scatter_mapbox(
@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import folium
-from streamlit_folium import folium_static
+from folium.plugins import FastMarkerCluster
+import streamlit.components.v1 as components
 
 # Set page config
 st.set_page_config(
@@ -26,6 +27,28 @@ def load_data():
         st.error(f"Error loading data: {e}")
         return None
 
+# One row per (restaurant, category), exploded once instead of on every filter
+@st.cache_data
+def load_long_data():
+    df = load_data()
+    return df[['province', 'name', 'city', 'categories']].explode('categories')
+
+# Leaflet callback drawing each FastMarkerCluster row as a circle marker with a popup
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {radius: 5, color: 'red', fill: true});
+    marker.bindPopup(row[2]);
+    return marker;
+}
+"""
+
+# Filter data by the selected states and restaurant chains
+def filter_data(df, selected_state, selected_chains):
+    filtered_df = df[df['province'].isin(selected_state)]
+    if selected_chains:
+        filtered_df = filtered_df[filtered_df['name'].isin(selected_chains)]
+    return filtered_df
+
 def create_density_map(filtered_df):
     # Sample data for map if too large
     MAX_MAP_POINTS = 1000
@@ -36,17 +59,54 @@ def create_density_map(filtered_df):
 
     m = folium.Map(location=[39.8283, -98.5795], zoom_start=4)
     
-    for idx, row in map_df.iterrows():
-        folium.CircleMarker(
-            location=[row['latitude'], row['longitude']],
-            radius=5,
-            popup=f"{row['name']} - {row['city']}, {row['province']}",
-            color='red',
-            fill=True
-        ).add_to(m)
+    # Build popup rows from the column arrays instead of iterating DataFrame rows
+    data = [
+        [lat, lon, f"{name} - {city}, {province}"]
+        for lat, lon, name, city, province in zip(
+            map_df['latitude'].tolist(),
+            map_df['longitude'].tolist(),
+            map_df['name'].tolist(),
+            map_df['city'].tolist(),
+            map_df['province'].tolist()
+        )
+    ]
+    
+    # Pass all markers to Leaflet in one layer instead of one marker per row
+    FastMarkerCluster(data=data, callback=MARKER_CALLBACK).add_to(m)
     
     return m
 
+# Cache the rendered map HTML by filter selection so unchanged filters skip the rebuild;
+# each session gets its own copy of the string instead of sharing a mutable folium.Map
+@st.cache_data(max_entries=32)
+def render_density_map(selected_state, selected_chains):
+    m = create_density_map(filter_data(load_data(), selected_state, selected_chains))
+    return folium.Figure().add_child(m).render()
+
+# Cache per-tab statistics by filter selection so each runs once per combination
+@st.cache_data
+def get_density_counts(selected_state, selected_chains):
+    filtered_df = filter_data(load_data(), selected_state, selected_chains)
+    density_df = filtered_df['province'].value_counts().reset_index()
+    density_df.columns = ['State', 'Count']
+    return density_df
+
+@st.cache_data
+def get_category_counts(selected_state, selected_chains):
+    long_df = filter_data(load_long_data(), selected_state, selected_chains)
+    return long_df['categories'].value_counts()
+
+@st.cache_data
+def get_state_analysis(state):
+    df = load_data()
+    state_df = df[df['province'] == state]
+    city_counts = state_df['city'].value_counts().head(10)
+    chain_counts = state_df['name'].value_counts().head(10)
+    avg_per_city = len(state_df) / len(state_df['city'].unique())
+    long_df = load_long_data()
+    state_categories = long_df[long_df['province'] == state]['categories'].value_counts().head(5)
+    return city_counts, chain_counts, avg_per_city, state_categories
+
 def main():
     st.title("🍔 US Fast Food Restaurant Analysis")
     
@@ -91,22 +151,21 @@ def main():
     tab1, tab2, tab3 = st.tabs(["📍 Location Density", "🥤 Restaurant Categories", "📊 State Analysis"])
     
     # Filter data based on selections
-    filtered_df = df[df['province'].isin(selected_state)]
-    if selected_chains:
-        filtered_df = filtered_df[filtered_df['name'].isin(selected_chains)]
+    filtered_df = filter_data(df, selected_state, selected_chains)
+    state_key = tuple(sorted(selected_state))
+    chain_key = tuple(sorted(selected_chains))
     
     with tab1:
         st.header("Fast Food Restaurant Locations")
         
         if not filtered_df.empty:
             with st.spinner('Creating map...'):
-                m = create_density_map(filtered_df)
-                folium_static(m)
+                # Same frame size folium_static used for a folium.Map
+                components.html(render_density_map(state_key, chain_key), height=510, width=700)
             
             # Show density statistics
             st.subheader("Restaurant Density by State")
-            density_df = filtered_df['province'].value_counts().reset_index()
-            density_df.columns = ['State', 'Count']
+            density_df = get_density_counts(state_key, chain_key)
             
             fig = px.bar(density_df, x='State', y='Count',
                         title='Number of Fast Food Restaurants by State')
@@ -119,8 +178,7 @@ def main():
             st.header("Restaurant Categories Analysis")
             
             # Process categories
-            categories_df = filtered_df.explode('categories')
-            category_counts = categories_df['categories'].value_counts()
+            category_counts = get_category_counts(state_key, chain_key)
             
             # Create pie chart
             fig = px.pie(values=category_counts.values,
@@ -143,14 +201,13 @@ def main():
                 selected_state
             )
             
-            state_df = df[df['province'] == selected_state_analysis]
+            city_counts, chain_counts, avg_per_city, state_categories = get_state_analysis(selected_state_analysis)
             
             col1, col2 = st.columns(2)
             
             with col1:
                 # Show top cities
                 st.subheader(f"Top Cities in {selected_state_analysis}")
-                city_counts = state_df['city'].value_counts().head(10)
                 fig = px.bar(x=city_counts.index, y=city_counts.values,
                             title=f'Top 10 Cities with Most Fast Food Restaurants')
                 st.plotly_chart(fig, use_container_width=True)
@@ -158,7 +215,6 @@ def main():
             with col2:
                 # Show top restaurant chains
                 st.subheader("Popular Restaurant Chains")
-                chain_counts = state_df['name'].value_counts().head(10)
                 fig = px.bar(x=chain_counts.index, y=chain_counts.values,
                             title='Top 10 Restaurant Chains')
                 st.plotly_chart(fig, use_container_width=True)
@@ -167,12 +223,10 @@ def main():
             st.subheader("Restaurant Distribution Analysis")
             
             # Average restaurants per city
-            avg_per_city = len(state_df) / len(state_df['city'].unique())
             st.metric("Average Restaurants per City", f"{avg_per_city:.2f}")
             
             # Most common categories in state
             st.subheader("Popular Categories in State")
-            state_categories = state_df.explode('categories')['categories'].value_counts().head(5)
             st.bar_chart(state_categories)
             
         else: